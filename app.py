@@ -1,9 +1,24 @@
 import streamlit as st
 import pandas as pd
-import requests
+import numpy as np
+import httpx
 import time
+import json
+import threading
 import plotly.graph_objects as go
 from datetime import datetime
+from types import MappingProxyType
+
+try:
+    from numba import njit
+except ImportError:  # the rule kernel runs as plain Python without numba
+    def njit(*args, **kwargs):
+        return lambda fn: fn
+
+try:
+    import paho.mqtt.client as mqtt
+except ImportError:  # MQTT push is optional; falls back to REST polling
+    mqtt = None
 
 # ==========================================
 # 1. PAGE CONFIG & STYLING
@@ -16,7 +31,7 @@ st.set_page_config(
 )
 
 # CSS: Forces black text on white cards and adds better spacing
-st.markdown("""
+CSS = """
     <style>
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap');
     
@@ -69,18 +84,21 @@ st.markdown("""
         100% { box-shadow: 0 0 0 0 rgba(255, 65, 108, 0); transform: scale(1); } 
     }
     </style>
-    """, unsafe_allow_html=True)
+    """
+# Must be written on every full run: Streamlit removes elements a run doesn't re-emit
+st.markdown(CSS, unsafe_allow_html=True)
 
 # ==========================================
 # 2. CONFIGURATION & RANGES
 # ==========================================
 
-KNOWN_DEVICES = sorted([
-    '1 LIGHT', 'EMPTY', '2 LIGHTS', 'PHONE', 'LAPTOP', 
-    'LIGHT+LAPTOP', 'PHONE+LIGHT', 'LAPTOP+PHONE', 'LIGHT+LAPTOP+PHONE'
-])
+# Kept in sorted order by hand (selectbox options, index base for MIN_W/MAX_W)
+KNOWN_DEVICES: tuple[str, ...] = (
+    '1 LIGHT', '2 LIGHTS', 'EMPTY', 'LAPTOP', 'LAPTOP+PHONE',
+    'LIGHT+LAPTOP', 'LIGHT+LAPTOP+PHONE', 'PHONE', 'PHONE+LIGHT'
+)
 
-SAFE_RANGES = {
+SAFE_RANGES = MappingProxyType({
     'EMPTY':              (0.0, 0.0),    
     'PHONE':              (5.0, 28.0),    
     '1 LIGHT':            (34.0, 45.5),   
@@ -90,13 +108,69 @@ SAFE_RANGES = {
     '2 LIGHTS':           (34.0, 86.0),   
     'LIGHT+LAPTOP':       (21.0, 86.0),  
     'LIGHT+LAPTOP+PHONE': (5.0, 109.0)   
-}
+})
 
-if 'live_log' not in st.session_state:
-    st.session_state['live_log'] = pd.DataFrame(
-        columns=['Time', 'Device', 'Volts', 'Amps', 'Watts', 'Freq', 'PF', 'Status']
+# Safe ranges specialized into arrays aligned with KNOWN_DEVICES
+DEV_IDX = {d: i for i, d in enumerate(KNOWN_DEVICES)}
+MIN_W = np.array([SAFE_RANGES[d][0] for d in KNOWN_DEVICES], dtype=np.float32)
+MAX_W = np.array([SAFE_RANGES[d][1] for d in KNOWN_DEVICES], dtype=np.float32)
+
+RULE_REASONS = (
+    "Normal Usage",
+    "Under-Power (Read {p:.1f}W, Expected >{min_w}W)",
+    "Over-Power (Read {p:.1f}W, Expected <{max_w}W)",
+    "Current Bypass Detected (V*I >> W)",
+)
+
+SAFE_HTML_TMPL = """
+<div class="status-box status-safe">
+    ✅ SYSTEM NORMAL <br>
+    <span style="font-size:16px; font-weight:normal; opacity:0.9">{reason}</span>
+</div>
+"""
+DANGER_HTML_TMPL = """
+<div class="status-box status-danger">
+    🚨 THEFT DETECTED <br>
+    <span style="font-size:16px; font-weight:normal; opacity:0.9">{reason}</span>
+</div>
+"""
+
+LOG_SIZE = 15          # rows shown in the live table
+HISTORY_SIZE = 10_000  # readings kept for the power chart
+CHART_POINTS = 300     # LTTB target for the chart, independent of history length
+
+LAST_FEED_URL = "https://api.thingspeak.com/channels/{channel}/feeds/last.json?api_key={key}"
+BULK_FEED_URL = "https://api.thingspeak.com/channels/{channel}/feeds.json?api_key={key}&results={n}"
+MQTT_HOST, MQTT_PORT = "mqtt3.thingspeak.com", 1883
+PUSH_CHECK_S = 1  # how often the monitor checks the shared MQTT slot when push is active
+MAX_BACKOFF_S = 300  # ceiling for the REST retry interval while ThingSpeak is unreachable
+# Request/transport failures, bad URLs (e.g. a malformed Channel ID) and undecodable JSON
+FETCH_ERRORS = (httpx.HTTPError, httpx.InvalidURL, ValueError)
+
+# One keep-alive HTTP/2 client per browser session (skips the TLS handshake on every poll)
+if 'http' not in st.session_state:
+    st.session_state.http = httpx.Client(
+        http2=True,
+        timeout=3,
+        headers={'Accept': 'application/json'},
+        limits=httpx.Limits(max_connections=2, max_keepalive_connections=1),
     )
 
+# Live log is a fixed-size ring buffer of column arrays (oldest slot overwritten)
+if 'live_log' not in st.session_state:
+    st.session_state['live_log'] = {
+        'Time':   np.empty(HISTORY_SIZE, dtype='datetime64[s]'),
+        'Device': np.empty(HISTORY_SIZE, dtype=object),
+        'Volts':  np.empty(HISTORY_SIZE, dtype=np.float32),
+        'Amps':   np.empty(HISTORY_SIZE, dtype=np.float32),
+        'Watts':  np.empty(HISTORY_SIZE, dtype=np.float32),
+        'Freq':   np.empty(HISTORY_SIZE, dtype=np.float32),
+        'PF':     np.empty(HISTORY_SIZE, dtype=np.float32),
+        'Status': np.empty(HISTORY_SIZE, dtype='U8'),
+    }
+    st.session_state['log_head'] = 0
+    st.session_state['log_count'] = 0
+
 # ==========================================
 # 3. SIDEBAR CONTROLS
 # ==========================================
@@ -128,47 +202,251 @@ with st.sidebar:
         f_pf   = st.selectbox("PF", ts_fields, index=4)
         f_egy  = st.selectbox("Energy", ts_fields, index=5)
 
+    with st.expander("📡 MQTT Push (optional)", expanded=False):
+        st.caption("ThingSpeak MQTT device credentials. Leave blank to poll over REST.")
+        MQTT_CLIENT_ID = st.text_input("Client ID", value="")
+        MQTT_USER = st.text_input("Username", value="")
+        MQTT_PASS = st.text_input("Password", value="", type="password")
+
     st.markdown("### 🔌 Device Context")
     selected_device = st.selectbox("What is connected?", KNOWN_DEVICES)
     
     st.markdown("---")
     refresh_rate = st.slider("Update Speed (s)", 2, 60, 15)
 
+feed_url = LAST_FEED_URL.format(channel=CHANNEL_ID, key=READ_API_KEY)
+FIELDS = (f_volt, f_curr, f_pow, f_freq, f_pf, f_egy)
+dev_idx = DEV_IDX[selected_device]
+
 # ==========================================
 # 4. LOGIC FUNCTIONS
 # ==========================================
+@st.cache_data(ttl=max(1, refresh_rate - 1), show_spinner=False)
+def _fetch_latest(url, last_entry_id, _http):
+    """Latest entry. Keyed by the last seen entry_id so reruns inside one tick don't re-poll.
+    Failures raise instead of returning None, so they are never cached."""
+    r = _http.get(url)
+    r.raise_for_status()
+    body = r.json()
+    if not isinstance(body, dict):
+        raise ValueError(f"unexpected feed body: {body!r}")  # ThingSpeak's -1
+    return body
+
 def fetch_data():
+    """Latest entry, or None if the poll failed (a None always means a real failed request)."""
     try:
-        url = f"https://api.thingspeak.com/channels/{CHANNEL_ID}/feeds/last.json?api_key={READ_API_KEY}"
-        r = requests.get(url, timeout=3)
-        return r.json() if r.status_code == 200 else None
-    except: return None
+        return _fetch_latest(feed_url, st.session_state.get('last_entry_id'), st.session_state.http)
+    except FETCH_ERRORS: return None
+
+def bulk_fetch(n=LOG_SIZE):
+    """Last n entries, oldest first (empty list if the channel can't be read)."""
+    url = BULK_FEED_URL.format(channel=CHANNEL_ID, key=READ_API_KEY, n=n)
+    try:
+        r = st.session_state.http.get(url)
+        body = r.json() if r.status_code == 200 else None
+    except FETCH_ERRORS: return []
+    # ThingSpeak answers -1 (not an object) for unreadable channels
+    return body.get('feeds', []) if isinstance(body, dict) else []
+
+@st.cache_resource(show_spinner=False)
+def mqtt_registry():
+    """Process-wide MQTT clients keyed by client ID (the broker allows one connection per ID)."""
+    return {'lock': threading.Lock(), 'clients': {}}
+
+def mqtt_topic(channel_id):
+    return f"channels/{channel_id}/subscribe"
+
+def new_subscriber(client_id, username, password):
+    """Connect one paho client; its slot holds the newest entry pushed on the current channel."""
+    sub = {'auth': (username, password), 'channel': None, 'latest': {'msg': None}}
+
+    # Runs on paho's network thread: only touch `sub`, never st.session_state
+    def on_connect(client, userdata, flags, reason_code, properties):
+        if sub['channel']:
+            client.subscribe(mqtt_topic(sub['channel']))
+    def on_message(client, userdata, msg):
+        if msg.topic != mqtt_topic(sub['channel']):
+            return  # late message from a channel we already left
+        try: sub['latest']['msg'] = json.loads(msg.payload)
+        except ValueError: pass
+
+    client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id)
+    client.username_pw_set(username, password)
+    client.on_connect = on_connect
+    client.on_message = on_message
+    client.connect_async(MQTT_HOST, MQTT_PORT)
+    client.loop_start()
+    sub['client'] = client
+    return sub
+
+def drop_subscriber(clients, client_id):
+    sub = clients.pop(client_id, None)
+    if sub:
+        sub['client'].loop_stop()
+        sub['client'].disconnect()
+
+def start_mqtt():
+    """Shared push slot for the entered credentials, or None to poll REST.
+
+    Reuses the client for MQTT_CLIENT_ID (resubscribing if the channel changed) and
+    tears down any client whose credentials are stale, so one ID never connects twice.
+    """
+    registry = mqtt_registry()
+    prev_id = st.session_state.get('mqtt_client_id')
+    creds = (CHANNEL_ID, MQTT_CLIENT_ID, MQTT_USER, MQTT_PASS)
+    with registry['lock']:
+        clients = registry['clients']
+        if prev_id and prev_id != MQTT_CLIENT_ID:
+            drop_subscriber(clients, prev_id)  # this session moved to another client ID
+        if mqtt is None or not all(creds):
+            st.session_state.pop('mqtt_client_id', None)
+            return None
+
+        sub = clients.get(MQTT_CLIENT_ID)
+        if sub and sub['auth'] != (MQTT_USER, MQTT_PASS):
+            drop_subscriber(clients, MQTT_CLIENT_ID)
+            sub = None
+        if sub is None:
+            sub = clients[MQTT_CLIENT_ID] = new_subscriber(MQTT_CLIENT_ID, MQTT_USER, MQTT_PASS)
+        if sub['channel'] != CHANNEL_ID:
+            if sub['channel']:
+                sub['client'].unsubscribe(mqtt_topic(sub['channel']))
+            sub['channel'] = CHANNEL_ID
+            sub['latest']['msg'] = None
+            sub['client'].subscribe(mqtt_topic(CHANNEL_ID))  # no-op until connected; on_connect retries
+    st.session_state.mqtt_client_id = MQTT_CLIENT_ID
+    return sub['latest']
+
+def drain_push(slot):
+    """Newest pushed reading this session hasn't logged yet, or None."""
+    msg = slot['msg'] if slot is not None else None
+    if msg is None or msg.get('entry_id') == st.session_state.get('last_entry_id'):
+        return None
+    return msg
+
+def poll_due():
+    return time.monotonic() - st.session_state.get('last_poll', 0.0) >= st.session_state.backoff
+
+def update_backoff(ok):
+    """Reset the REST interval after a good poll, double it (capped) after a failed one."""
+    st.session_state.backoff = refresh_rate if ok else min(st.session_state.backoff * 2, MAX_BACKOFF_S)
+
+@njit(cache=True)
+def _rules(v, i, p, lo, hi):
+    """Rule code: 0 = normal, 1 = under, 2 = over, 3 = bypass (bypass wins over range checks)."""
+    theft = 0
+    if p < lo:
+        theft = 1
+    elif p > hi:
+        theft = 2
+    if (v * i) - p > 50.0 and p > 5.0:
+        theft = 3
+    return theft
 
 def check_physics_rules(data_json):
-    def get(f): return float(data_json.get(f, 0)) if data_json.get(f) and data_json.get(f) != 'null' else 0.0
-    
-    v, i, p = get(f_volt), get(f_curr), get(f_pow)
-    f, pf, e = get(f_freq), get(f_pf), get(f_egy)
-    
-    is_theft = False
-    reason = "Normal Usage"
-    
-    if selected_device in SAFE_RANGES:
-        min_w, max_w = SAFE_RANGES[selected_device]
-        if p < min_w:
-            is_theft = True
-            reason = f"Under-Power (Read {p:.1f}W, Expected >{min_w}W)"
-        elif p > max_w:
-            is_theft = True
-            reason = f"Over-Power (Read {p:.1f}W, Expected <{max_w}W)"
-            
-    apparent_power = v * i
-    if (apparent_power - p) > 50.0 and p > 5.0:
-        is_theft = True
-        reason = "Current Bypass Detected (V*I >> W)"
+    raw = [data_json.get(k) for k in FIELDS]
+    v, i, p, f, pf, e = np.array([0.0 if x in (None, 'null', '') else x for x in raw], dtype=np.float32)
+
+    min_w, max_w = MIN_W[dev_idx], MAX_W[dev_idx]
+
+    code = _rules(v, i, p, min_w, max_w)
+
+    is_theft = code > 0
+    reason = RULE_REASONS[code].format(p=p, min_w=min_w, max_w=max_w) if is_theft else RULE_REASONS[0]
 
     return is_theft, reason, v, i, p, f, pf, e
 
+def power_chart():
+    """Figure built once per session; the safe-zone band is redrawn only when the device changes."""
+    if 'fig' not in st.session_state:
+        fig = go.Figure(go.Scatter(
+            x=[], y=[],
+            fill='tozeroy',
+            mode='lines+markers',
+            line=dict(width=3),
+            name='Power (W)'
+        ))
+        fig.update_layout(
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            margin=dict(l=0, r=0, t=10, b=0),
+            height=300,
+            xaxis=dict(type='date', showgrid=False, color='gray'),
+            yaxis=dict(showgrid=True, gridcolor='rgba(128,128,128,0.2)', color='gray')
+        )
+        st.session_state.fig = fig
+
+    fig = st.session_state.fig
+    if st.session_state.get('last_device') != selected_device:
+        fig.layout.shapes = ()
+        fig.layout.annotations = ()
+        if selected_device in SAFE_RANGES:
+            min_w, max_w = SAFE_RANGES[selected_device]
+            fig.add_hrect(y0=min_w, y1=max_w, line_width=0, fillcolor="green", opacity=0.1, annotation_text="Safe Zone")
+        st.session_state.last_device = selected_device
+    return fig
+
+def log_append(t, v, i, p, f, pf, is_theft):
+    """Write one reading into the oldest ring-buffer slot (numbers stay raw floats)."""
+    log, head = st.session_state['live_log'], st.session_state['log_head']
+    log['Time'][head] = t
+    log['Device'][head] = selected_device
+    log['Volts'][head] = v
+    log['Amps'][head] = i
+    log['Watts'][head] = p
+    log['Freq'][head] = f
+    log['PF'][head] = pf
+    log['Status'][head] = "🚨 THEFT" if is_theft else "✅ OK"
+    st.session_state['log_head'] = (head + 1) % HISTORY_SIZE
+    st.session_state['log_count'] = min(st.session_state['log_count'] + 1, HISTORY_SIZE)
+
+def hydrate_log():
+    """Seed an empty log with recent channel history so a fresh tab starts with a chart."""
+    for feed in bulk_fetch():
+        is_theft, _, v, i, p, f, pf, _ = check_physics_rules(feed)
+        t = datetime.fromisoformat(feed['created_at'].replace('Z', '+00:00')).astimezone().replace(tzinfo=None)
+        log_append(t, v, i, p, f, pf, is_theft)
+        st.session_state.last_entry_id = feed.get('entry_id')
+
+def lttb(y, n_out):
+    """Indices kept by Largest-Triangle-Three-Buckets downsampling (x is the sample position)."""
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    # First and last points are always kept; the interior is split into n_out - 2 buckets
+    x = np.arange(n, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    keep = np.empty(n_out, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for k in range(n_out - 2):
+        lo, hi = edges[k], edges[k + 1]
+        if k + 2 < len(edges):
+            nx, ny = x[hi:edges[k + 2]].mean(), y[hi:edges[k + 2]].mean()
+        else:
+            nx, ny = x[-1], y[-1]
+        area = np.abs((x[a] - nx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (ny - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[k + 1] = a
+    return keep
+
+def chart_series():
+    """Full power history oldest first, LTTB-reduced to at most CHART_POINTS samples."""
+    log = st.session_state['live_log']
+    head, count = st.session_state['log_head'], st.session_state['log_count']
+    order = (head - count + np.arange(count)) % HISTORY_SIZE
+    watts = log['Watts'][order]
+    keep = lttb(watts, CHART_POINTS)
+    return log['Time'][order[keep]], watts[keep]
+
+def log_frame(rows=LOG_SIZE):
+    """Materialize the newest `rows` readings as a DataFrame, newest row first."""
+    log = st.session_state['live_log']
+    head, count = st.session_state['log_head'], min(st.session_state['log_count'], rows)
+    order = (head - 1 - np.arange(count)) % HISTORY_SIZE
+    return pd.DataFrame({col: arr[order] for col, arr in log.items()})
+
 # ==========================================
 # 5. DASHBOARD LAYOUT
 # ==========================================
@@ -201,27 +479,40 @@ log_table = st.empty()
 # 6. RUN LOGIC
 # ==========================================
 
-if st.session_state.running:
-    raw_data = fetch_data()
+push_slot = start_mqtt() if st.session_state.running else None
+
+@st.fragment(run_every=PUSH_CHECK_S if push_slot is not None else refresh_rate)
+def monitor():
+    # Only the placeholders are redrawn here; sidebar, CSS and layout stay untouched between ticks
+    repaint = st.session_state.pop('repaint', False)
+    raw_data = drain_push(push_slot)
+    if raw_data is None:
+        # With push active, fall back to REST only if nothing arrived for a full refresh interval;
+        # after failed polls, wait out the backoff instead of hitting ThingSpeak every tick
+        waiting = push_slot is not None or st.session_state.backoff > refresh_rate
+        if waiting and not (repaint or poll_due()):
+            return
+        raw_data = fetch_data()
+        update_backoff(raw_data is not None)
+    st.session_state.last_poll = time.monotonic()
+
+    # Same entry as last tick: nothing new to log, only redraw if the page was rebuilt
+    entry_id = raw_data.get('entry_id') if raw_data else None
+    is_new = entry_id is None or entry_id != st.session_state.get('last_entry_id')
+    if raw_data and not (is_new or repaint):
+        return
     
     if raw_data:
         is_theft, reason, v, i, p, f, pf, e = check_physics_rules(raw_data)
         
-        # 1. Update Banner
-        if is_theft:
-            top_banner.markdown(f"""
-            <div class="status-box status-danger">
-                🚨 THEFT DETECTED <br>
-                <span style="font-size:16px; font-weight:normal; opacity:0.9">{reason}</span>
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            top_banner.markdown(f"""
-            <div class="status-box status-safe">
-                ✅ SYSTEM NORMAL <br>
-                <span style="font-size:16px; font-weight:normal; opacity:0.9">Power usage within {selected_device} range</span>
-            </div>
-            """, unsafe_allow_html=True)
+        # 1. Update Banner (only rewritten when the state or reason changes)
+        banner = (is_theft, reason)
+        if banner != st.session_state.get('last_banner'):
+            if is_theft:
+                top_banner.markdown(DANGER_HTML_TMPL.format(reason=reason), unsafe_allow_html=True)
+            else:
+                top_banner.markdown(SAFE_HTML_TMPL.format(reason=f"Power usage within {selected_device} range"), unsafe_allow_html=True)
+            st.session_state.last_banner = banner
 
         # 2. Update Cards
         card_v.metric("Voltage (V)", f"{v:.1f} V")
@@ -229,71 +520,49 @@ if st.session_state.running:
         card_p.metric("Power (W)", f"{p:.1f} W", delta=None)
         
         # 3. Update Log (Added Volts, Amps, Freq, PF)
-        new_row = {
-            'Time': datetime.now().strftime("%H:%M:%S"),
-            'Device': selected_device,
-            'Volts': f"{v:.1f}",
-            'Amps': f"{i:.3f}",
-            'Watts': f"{p:.1f}",
-            'Freq': f"{f:.1f}",
-            'PF': f"{pf:.2f}",
-            'Status': "🚨 THEFT" if is_theft else "✅ OK"
-        }
+        if is_new:
+            log_append(datetime.now(), v, i, p, f, pf, is_theft)
+            st.session_state.last_entry_id = entry_id
+        live_log = log_frame()
         
-        # Add to history
-        st.session_state['live_log'] = pd.concat(
-            [pd.DataFrame([new_row]), st.session_state['live_log']], 
-            ignore_index=True
-        ).head(15) 
-        
-        # Styling
-        def highlight_status(val):
-            color = '#ffeba8' if val == '🚨 THEFT' else '#cdf0ea'
-            return f'background-color: {color}; color: black; border-radius: 5px'
-
         # Display Table with all columns
         log_table.dataframe(
-            st.session_state['live_log'].style.applymap(highlight_status, subset=['Status']), 
+            live_log,
             use_container_width=True, 
             hide_index=True,
             column_config={
-                "Time": st.column_config.TextColumn("Time", width="small"),
+                "Time": st.column_config.DatetimeColumn("Time", format="HH:mm:ss", width="small"),
                 "Device": st.column_config.TextColumn("Device", width="medium"),
+                "Volts": st.column_config.NumberColumn("Volts", format="%.1f"),
+                "Amps": st.column_config.NumberColumn("Amps", format="%.3f"),
+                "Watts": st.column_config.NumberColumn("Watts", format="%.1f"),
+                "Freq": st.column_config.NumberColumn("Freq", format="%.1f"),
+                "PF": st.column_config.NumberColumn("PF", format="%.2f"),
+                "Status": st.column_config.TextColumn("Status", width="small"),
             }
         )
         
-        # 4. Update Chart
-        chart_data = st.session_state['live_log'].iloc[::-1]
-        fig = go.Figure()
-        
-        if selected_device in SAFE_RANGES:
-            min_w, max_w = SAFE_RANGES[selected_device]
-            fig.add_hrect(y0=min_w, y1=max_w, line_width=0, fillcolor="green", opacity=0.1, annotation_text="Safe Zone")
-
-        fig.add_trace(go.Scatter(
-            x=chart_data['Time'], 
-            y=pd.to_numeric(chart_data['Watts']),
-            fill='tozeroy',
-            mode='lines+markers',
-            line=dict(width=3, color='#ff4b4b' if is_theft else '#2ecc71'),
-            name='Power (W)'
-        ))
-        
-        fig.update_layout(
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            margin=dict(l=0, r=0, t=10, b=0),
-            height=300,
-            xaxis=dict(showgrid=False, color='gray'),
-            yaxis=dict(showgrid=True, gridcolor='rgba(128,128,128,0.2)', color='gray')
-        )
+        # 4. Update Chart (cached figure, only the trace data changes per tick)
+        fig = power_chart()
+        trace = fig.data[0]
+        trace.x, trace.y = chart_series()
+        trace.line.color = '#ff4b4b' if is_theft else '#2ecc71'
         chart_plot.plotly_chart(fig, use_container_width=True)
         
     else:
         top_banner.warning("📡 Connecting to Smart Meter (ThingSpeak)...")
+        st.session_state.last_banner = None
+
+if st.session_state.running:
+    st.session_state.setdefault('backoff', refresh_rate)
+    if st.session_state['log_count'] == 0:
+        hydrate_log()
 
-    time.sleep(refresh_rate)
-    st.rerun()
+    # Full script run: placeholders above are fresh, so the first tick must draw them
+    st.session_state.repaint = True
+    st.session_state.last_banner = None
+    monitor()
 
 else:
+    st.session_state.pop('backoff', None)
     top_banner.info("👈 Select settings in the sidebar and click 'START MONITORING'")